@@ -0,0 +1,9 @@
+# numba is optional: without it the kernels below run as plain Python loops
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,28 @@
+"""
+Build step: AOT-compile the numba kernels from indicators.py into a native `ta_kernels`
+extension next to this file. indicators.py imports it when present, so cron runs start
+without any JIT compile; without it they fall back to @njit(cache=True).
+
+    python build_kernels.py
+"""
+import os
+import sys
+from numba.pycc import CC
+
+sys.modules["ta_kernels"] = None  # compile from the Python sources, not a previous build
+import indicators
+
+cc = CC("ta_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export("rsi_wilder", "f8[:](f8[:], i8)")(indicators._rsi_wilder.py_func)
+cc.export("ewma", "f8[:](f8[:], i8)")(indicators._ewma.py_func)
+cc.export("rsi_ema_swing", "UniTuple(f8[:], 5)(f4[:], f4[:], f4[:], i8, i8, i8, i8)")(
+    indicators._rsi_ema_swing.py_func)
+
+if __name__ == "__main__":
+    try:
+        cc.compile()
+        print(f"✅ Built {cc.output_file}")
+    except Exception as e:
+        # Not fatal: the JIT path still works, it just pays the compile on first call
+        print(f"⚠️ AOT build failed, kernels will be JIT-compiled at runtime: {e}")
@@ -0,0 +1,158 @@
+# Indicator kernels used by utils.py (one numba cache shared by every entrypoint)
+import numpy as np
+import pandas as pd
+from _njit import njit
+
+@njit(cache=True)
+def _rsi_wilder(close: np.ndarray, n: int) -> np.ndarray:
+    # Wilder RSI: seed with the SMA of the first n gains/losses, then smooth recursively
+    out = np.full(close.size, np.nan)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, close.size):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if i <= n:
+            avg_gain += gain / n
+            avg_loss += loss / n
+            if i < n:
+                continue
+        else:
+            avg_gain = (avg_gain * (n - 1) + gain) / n
+            avg_loss = (avg_loss * (n - 1) + loss) / n
+        if avg_loss != 0.0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+# The public kernels coerce their inputs: the AOT build (see build_kernels.py) is compiled
+# for one exact signature and crashes the process, rather than raising, on any other dtype.
+def rsi_wilder(close: np.ndarray, n: int) -> np.ndarray:
+    return _rsi_wilder(np.ascontiguousarray(close, dtype=np.float64), int(n))
+
+@njit(cache=True)
+def _ewma(x: np.ndarray, span: int) -> np.ndarray:
+    # Same recurrence as Series.ewm(span=span, adjust=False).mean()
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    if x.size == 0:
+        return out
+    out[0] = x[0]
+    for i in range(1, x.size):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+def ewma(x: np.ndarray, span: int) -> np.ndarray:
+    return _ewma(np.ascontiguousarray(x, dtype=np.float64), int(span))
+
+def compute_atr(df: pd.DataFrame, length: int) -> pd.Series:
+    h = df["High"].to_numpy(dtype=np.float64)
+    l = df["Low"].to_numpy(dtype=np.float64)
+    c = df["Close"].to_numpy(dtype=np.float64)
+    pc = np.empty_like(c)
+    pc[:1] = np.nan
+    pc[1:] = c[:-1]
+    # fmax skips the NaN prev close on the first bar, so TR[0] = High - Low
+    tr = np.fmax.reduce([h - l, np.abs(h - pc), np.abs(l - pc)])
+    return pd.Series(ewma(tr, length), index=df.index)
+
+@njit(cache=True)
+def _rsi_ema_swing(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                   rsi_n: int, ema_fast: int, ema_slow: int, swing: int):
+    # Fused rsi_wilder + 2x ewma + rolling High max / Low min (monotonic deques, NaN until
+    # the window is full): one pass over Close/High/Low. Reads float32 prices; accumulators
+    # and outputs stay float64.
+    size = close.size
+    rsi = np.full(size, np.nan)
+    fast = np.empty(size)
+    slow = np.empty(size)
+    swing_high = np.full(size, np.nan)
+    swing_low = np.full(size, np.nan)
+    if size == 0:
+        return rsi, fast, slow, swing_high, swing_low
+
+    a_fast = 2.0 / (ema_fast + 1.0)
+    a_slow = 2.0 / (ema_slow + 1.0)
+    fast[0] = close[0]
+    slow[0] = close[0]
+    avg_gain = 0.0
+    avg_loss = 0.0
+    dq_hi = np.empty(size, np.int64)
+    dq_lo = np.empty(size, np.int64)
+    hi_head = hi_tail = lo_head = lo_tail = 0
+
+    for i in range(size):
+        # swing high/low (monotonic deques)
+        while hi_tail > hi_head and high[dq_hi[hi_tail - 1]] <= high[i]:
+            hi_tail -= 1
+        dq_hi[hi_tail] = i
+        hi_tail += 1
+        while dq_hi[hi_head] <= i - swing:
+            hi_head += 1
+        while lo_tail > lo_head and low[dq_lo[lo_tail - 1]] >= low[i]:
+            lo_tail -= 1
+        dq_lo[lo_tail] = i
+        lo_tail += 1
+        while dq_lo[lo_head] <= i - swing:
+            lo_head += 1
+        if i >= swing - 1:
+            swing_high[i] = high[dq_hi[hi_head]]
+            swing_low[i] = low[dq_lo[lo_head]]
+
+        if i == 0:
+            continue
+
+        # EMAs
+        fast[i] = a_fast * close[i] + (1.0 - a_fast) * fast[i - 1]
+        slow[i] = a_slow * close[i] + (1.0 - a_slow) * slow[i - 1]
+
+        # Wilder RSI
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if i <= rsi_n:
+            avg_gain += gain / rsi_n
+            avg_loss += loss / rsi_n
+            if i < rsi_n:
+                continue
+        else:
+            avg_gain = (avg_gain * (rsi_n - 1) + gain) / rsi_n
+            avg_loss = (avg_loss * (rsi_n - 1) + loss) / rsi_n
+        if avg_loss != 0.0:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    return rsi, fast, slow, swing_high, swing_low
+
+def rsi_ema_swing(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                  rsi_n: int, ema_fast: int, ema_slow: int, swing: int):
+    # Returns (rsi, ema_fast, ema_slow, swing_high, swing_low) as float64 arrays
+    close, high, low = (np.ascontiguousarray(a, dtype=np.float32) for a in (close, high, low))
+    return _rsi_ema_swing(close, high, low, int(rsi_n), int(ema_fast), int(ema_slow), int(swing))
+
+def add_vwap(df: pd.DataFrame) -> pd.DataFrame:
+    # Intraday VWAP resets daily (UTC); assumes a sorted index
+    if df.empty:
+        df["VWAP"] = np.nan
+        return df
+    day = pd.to_datetime(df.index, utc=True).normalize().asi8
+    h = df["High"].to_numpy(dtype=np.float64)
+    l = df["Low"].to_numpy(dtype=np.float64)
+    c = df["Close"].to_numpy(dtype=np.float64)
+    v = df["Volume"].to_numpy(dtype=np.float64)
+
+    # One global cumsum, then subtract the running total at the end of the previous day
+    cum_pv = np.cumsum((h + l + c) / 3.0 * v)
+    cum_v  = np.cumsum(v)
+    starts = np.flatnonzero(np.diff(day, prepend=day[0] - 1))
+    seg_len = np.diff(np.append(starts, day.size))
+    cum_pv -= np.repeat(np.concatenate(([0.0], cum_pv[starts[1:] - 1])), seg_len)
+    cum_v  -= np.repeat(np.concatenate(([0.0], cum_v[starts[1:] - 1])), seg_len)
+    df["VWAP"] = np.divide(cum_pv, cum_v, out=np.full_like(cum_v, np.nan), where=cum_v != 0)
+    return df
+
+# Prefer the AOT-compiled kernels (see build_kernels.py) when the build step produced them
+try:
+    from ta_kernels import (rsi_wilder as _rsi_wilder, ewma as _ewma,
+                            rsi_ema_swing as _rsi_ema_swing)
+except ImportError:
+    pass
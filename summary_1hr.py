@@ -1,4 +1,4 @@
-from utils import utc_now, ts_str, hourly_digest, send_email
+from utils import utc_now, ts_str, hourly_digest, queue_email, flush_emails
 
 def run():
     now = utc_now()
@@ -6,9 +6,10 @@ def run():
     body = hourly_digest(now)
     if body:
         subject = "BTC Hourly Update"
-        send_email(subject, body)
+        queue_email(subject, body)
     else:
         print("No log or nothing to summarize.")
+    flush_emails()
 
 if __name__ == "__main__":
     run()
@@ -1,19 +1,51 @@
 import os
+import time
+import random
+import atexit
+import socket
+import json
 import smtplib
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 from pathlib import Path
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timezone, timedelta
+from indicators import rsi_wilder, ewma, rsi_ema_swing, compute_atr, add_vwap
 
 # ==== Config (env) ====
 EMAIL = os.getenv("EMAIL_ADDRESS")
 APP_PASSWORD = os.getenv("APP_PASSWORD")
 RECIPIENT = os.getenv("RECIPIENT_EMAIL")
 SYMBOL = "BTC-USD"
-LOG_PATH = Path(os.getenv("SIGNAL_LOG", "signals_log.csv"))
+LOG_PATH = Path(os.getenv("SIGNAL_LOG", "signals_log"))   # parquet dataset dir, partitioned by date
+LOG_SCHEMA = pa.schema([
+    ("time_utc", pa.timestamp("us", tz="UTC")),
+    ("signal", pa.string()),
+    ("price", pa.float64()),
+    ("target", pa.float64()),
+    ("stop", pa.float64()),
+    ("rsi5", pa.float64()),
+    ("ema9", pa.float64()),
+    ("ema21", pa.float64()),
+    ("vwap", pa.float64()),
+    ("atr5", pa.float64()),
+    ("hourly_trend", pa.string()),
+    ("rsi1h", pa.float64()),
+    ("reason", pa.string()),
+    ("date", pa.string()),
+])
+EMAIL_QUEUE = Path(os.getenv("EMAIL_QUEUE", "email_queue.jsonl"))  # pending (subject, body, queued_at), one JSON per line
+EMAIL_TTL = timedelta(minutes=15)  # queued emails older than this are dropped, not sent late
+SMTP_MAX_RATE = 14           # messages/sec ceiling when flushing the queue
+CACHE_5M = Path(os.getenv("CACHE_5M", "btc_5m.parquet"))
+CACHE_1H = Path(os.getenv("CACHE_1H", "btc_60m.parquet"))
+CONTEXT_1H = Path(os.getenv("CONTEXT_1H", "btc_60m_context.parquet"))  # 1h indicators, reused within the hour
+CONTEXT_1H_MAX_AGE = timedelta(minutes=55)
+BAR_COLS = ["High", "Low", "Close", "Volume"]  # all the indicators read (Volume is for VWAP)
 
 # 5m signal params
 RSI_LEN_5 = 14
@@ -30,6 +62,10 @@ RSI_LEN_1H = 14
 EMA_FAST_1H = 20
 EMA_SLOW_1H = 50
 
+# Bars fed to the indicators each run (only the last rows are read for signals)
+TAIL_5M = 256
+TAIL_1H = 300
+
 # ==== Helpers ====
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
@@ -37,100 +73,340 @@ def utc_now() -> datetime:
 def ts_str(ts: datetime) -> str:
     return ts.strftime("%Y-%m-%d %H:%M:%S %Z")
 
-def send_email(subject: str, body: str):
-    msg = MIMEMultipart()
+_SMTP = None  # one logged-in session per process, reused across flush_emails calls
+
+def _get_smtp() -> smtplib.SMTP_SSL:
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            _SMTP.noop()
+            return _SMTP
+        except (smtplib.SMTPException, OSError):
+            _SMTP = None  # server hung up; reconnect below
+    # Implicit TLS on 465 saves the EHLO/STARTTLS round-trip of port 587
+    server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+    try:
+        server.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        server.login(EMAIL, APP_PASSWORD)
+    except BaseException:
+        server.close()  # don't leak the TLS socket when login fails
+        raise
+    _SMTP = server
+    return server
+
+@atexit.register
+def _close_smtp():
+    if _SMTP is not None:
+        try:
+            _SMTP.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+def _build_message(subject: str, body: str) -> MIMEText:
+    # Plain-text only: a bare MIMEText avoids the multipart wrapper and boundary
+    msg = MIMEText(body, "plain")
     msg["From"] = EMAIL
     msg["To"] = RECIPIENT
     msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+def queue_email(subject: str, body: str, queued_at: float | None = None):
+    # Appended to a file so every script on this disk shares one queue and one flush
+    if queued_at is None:
+        queued_at = time.time()
+    with EMAIL_QUEUE.open("a", encoding="utf-8") as f:
+        f.write(json.dumps([subject, body, queued_at]) + "\n")
+
+def _claim_queue() -> list:
+    # Claim the queue atomically so a concurrent queue_email starts a fresh file
+    claimed = EMAIL_QUEUE.with_name(f"{EMAIL_QUEUE.name}.{os.getpid()}")
     try:
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(EMAIL, APP_PASSWORD)
-        server.sendmail(EMAIL, RECIPIENT, msg.as_string())
-        server.quit()
-        print(f"✅ Email sent: {subject}")
+        EMAIL_QUEUE.rename(claimed)
+    except FileNotFoundError:
+        return []
+    queued = []
+    try:
+        with claimed.open(encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    subject, body, queued_at = json.loads(line)
+                    queued.append((str(subject), str(body), float(queued_at)))
+                except (ValueError, TypeError) as e:
+                    # e.g. a half-written line from a process killed inside queue_email
+                    print(f"⚠️ Skipping bad email queue line {n}: {e}")
+    finally:
+        claimed.unlink(missing_ok=True)
+    return queued
+
+def flush_emails():
+    """
+    Send everything in EMAIL_QUEUE over a single SMTP session, at most SMTP_MAX_RATE per
+    second. Messages that fail to send are put back on the queue for the next flush until
+    they are older than EMAIL_TTL, then dropped. Never raises: a flush problem must not
+    fail the run that queued the emails.
+    """
+    try:
+        queued = _claim_queue()
+    except Exception as e:
+        print(f"❌ Email queue read failed: {e}")
+        return
+
+    # A signal alert is only actionable for a few bars; don't deliver a backlog hours late
+    cutoff = time.time() - EMAIL_TTL.total_seconds()
+    pending = [m for m in queued if m[2] >= cutoff]
+    dropped = len(queued) - len(pending)
+    if dropped:
+        print(f"🗑️ Dropped {dropped} queued email(s) older than {EMAIL_TTL}")
+    if not pending:
+        return
+
+    failed = []
+    try:
+        server = _get_smtp()
     except Exception as e:
-        print(f"❌ Email failed: {e}")
+        print(f"❌ Email failed ({len(pending)} queued): {e}")
+        failed = pending
+    else:
+        for i, (subject, body, queued_at) in enumerate(pending):
+            if i:
+                time.sleep(1 / SMTP_MAX_RATE)
+            try:
+                server.send_message(_build_message(subject, body))
+                print(f"✅ Email sent: {subject}")
+            except Exception as e:
+                print(f"❌ Email failed: {e}")
+                failed.append((subject, body, queued_at))
+    try:
+        for subject, body, queued_at in failed:
+            queue_email(subject, body, queued_at)
+    except Exception as e:
+        print(f"❌ Could not requeue {len(failed)} email(s): {e}")
 
-def fetch(interval: str, period: str) -> pd.DataFrame:
-    df = yf.download(SYMBOL, interval=interval, period=period)
-    df.dropna(inplace=True)
+def _flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # yfinance sometimes returns MultiIndex cols; flatten to simple strings
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ["_".join([str(x) for x in tup if str(x) != ""]) for tup in df.columns]
     return df
 
-def compute_rsi(close: pd.Series, length: int) -> pd.Series:
-    delta = close.diff()
-    gain = delta.clip(lower=0.0)
-    loss = -delta.clip(upper=0.0)
-    avg_gain = gain.rolling(length).mean()
-    avg_loss = loss.rolling(length).mean()
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
-
-def compute_atr(df: pd.DataFrame, length: int) -> pd.Series:
-    high, low, close = df["High"], df["Low"], df["Close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([(high - low),
-                    (high - prev_close).abs(),
-                    (low  - prev_close).abs()], axis=1).max(axis=1)
-    return tr.ewm(span=length, adjust=False).mean()
-
-def add_vwap(df: pd.DataFrame) -> pd.DataFrame:
-    # Reset VWAP by UTC day
-    idx = df.index
-    utc_dates = (pd.to_datetime(idx, utc=True).date
-                 if idx.tz is None else idx.tz_convert("UTC").date)
-    utc_dates = pd.Series(utc_dates, index=df.index)
-
-    tp = (df["High"] + df["Low"] + df["Close"]) / 3.0
-    cum_pv = (tp * df["Volume"]).groupby(utc_dates).cumsum()
-    cum_v  = df["Volume"].groupby(utc_dates).cumsum().replace(0, np.nan)
-    df["VWAP"] = cum_pv / cum_v
+def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename any yfinance variants to canonical: Open/High/Low/Close/Volume/AdjClose.
+    Handles names like 'Close_BTC-USD' or 'BTC-USD_Close'.
+    """
+    def find_like(name: str):
+        name_l = name.lower()
+        for c in df.columns:
+            s = str(c).lower()
+            if s == name_l:
+                return c
+            if s.endswith("_" + name_l) or s.startswith(name_l + "_"):
+                return c
+        return None
+
+    mapping = {}
+    for pretty, raw in [("Open", "open"), ("High", "high"), ("Low", "low"),
+                        ("Close", "close"), ("AdjClose", "adj close"), ("Volume", "volume")]:
+        col = find_like(raw)
+        if col is not None:
+            mapping[col] = pretty
+
+    if mapping:
+        df = df.rename(columns=mapping)
+
+    # If no Close but we have AdjClose, use AdjClose as Close
+    if "Close" not in df.columns and "AdjClose" in df.columns:
+        df["Close"] = df["AdjClose"]
+
+    needed = {"Open", "High", "Low", "Close", "Volume"}
+    missing = [c for c in needed if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing expected columns after normalization: {missing}. Got: {list(df.columns)}")
+
     return df
 
+_HTTP = None  # one HTTP session shared by every yfinance download in this process
+
+def _http_session():
+    # curl_cffi keeps the TLS connection to Yahoo alive between the 5m and 1h fetches and
+    # negotiates gzip/br; a plain requests.Session loses yfinance's browser impersonation
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = curl_requests.Session(impersonate="chrome")
+    return _HTTP
+
+_TICKER = None  # yf.Ticker for SYMBOL, bound to the shared HTTP session
+
+def _ticker() -> yf.Ticker:
+    global _TICKER
+    if _TICKER is None:
+        _TICKER = yf.Ticker(SYMBOL, session=_http_session())
+    return _TICKER
+
+def _interval_minutes(interval: str) -> int:
+    # "5m" -> 5, "60m" -> 60, "1h" -> 60, "1d" -> 1440 (also used for "60d"-style periods)
+    units = {"m": 1, "h": 60, "d": 1440}
+    return int(interval[:-1]) * units[interval[-1]]
+
+def _download(interval: str, retries: int = 3, base_delay: float = 2.0, **window) -> pd.DataFrame:
+    """
+    Download OHLCV with simple retry/backoff. `window` is passed through to yfinance
+    (period=... or start=...). Returns a normalized DataFrame or empty DF on failure.
+    """
+    last_err = None
+    for attempt in range(1, retries + 1):
+        try:
+            # Ticker.history skips yf.download's multi-ticker wrapping and returns flat columns.
+            # yfinance logs its own errors and hands back an empty frame, caught just below.
+            df = _ticker().history(interval=interval, auto_adjust=False, actions=False,
+                                   prepost=False, **window)
+            df = _flatten_columns(df)
+            if df.empty:
+                raise RuntimeError("yfinance returned empty DataFrame")
+            df = _normalize_ohlcv(df)
+            # Only these feed the indicators; projecting first keeps dropna and the cache narrow
+            return df[BAR_COLS].astype(np.float64).dropna()
+        except Exception as e:
+            last_err = e
+            delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 0.5)
+            print(f"⚠️ Fetch failed ({interval}, try {attempt}/{retries}): {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+    print(f"❌ Fetch failed after {retries} retries: {last_err}")
+    return pd.DataFrame()  # caller handles empty
+
+def _read_cache(cache_path: Path) -> pd.DataFrame:
+    if not cache_path.exists():
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception as e:
+        print(f"⚠️ Cache read failed ({cache_path}): {e}. Doing a full fetch.")
+        return pd.DataFrame()
+
+def _last_bar(cached: pd.DataFrame) -> pd.Timestamp:
+    last_ts = pd.Timestamp(cached.index.max())
+    if last_ts.tzinfo is None:
+        last_ts = last_ts.tz_localize("UTC")
+    return last_ts
+
+def _has_current_bar(cached: pd.DataFrame, interval: str) -> bool:
+    # True if the newest cached bar is the one for the current `interval` bucket
+    bar = pd.Timedelta(minutes=_interval_minutes(interval))
+    return _last_bar(cached) >= pd.Timestamp(utc_now()).floor(bar)
+
+def fetch_incremental(interval: str, period: str, cache_path: Path,
+                      retries: int = 3, base_delay: float = 2.0,
+                      reuse_current_bar: bool = False) -> pd.DataFrame:
+    """
+    Like a full `period` download, but reuses the bars cached at `cache_path` and only
+    requests the delta since the last cached bar. The merged frame is trimmed to `period`
+    and written back. With reuse_current_bar, a cache that already holds the current bar
+    is returned as-is without any download. Returns an empty DF if the download fails.
+    """
+    # Parsed by hand: pandas deprecates the lowercase "d" unit in Timedelta strings
+    window = pd.Timedelta(minutes=_interval_minutes(period))
+    cached = _read_cache(cache_path)
+    if reuse_current_bar and not cached.empty and _has_current_bar(cached, interval):
+        return cached  # another run already fetched this bar; skip the network entirely
+
+    start = None
+    if not cached.empty:
+        last_ts = _last_bar(cached)
+        # Stale cache (older than the whole window) -> just refetch everything
+        if utc_now() - last_ts < window:
+            # Re-request the last couple of bars so the in-progress candle gets replaced
+            start = last_ts - timedelta(minutes=_interval_minutes(interval) * 2)
+
+    if start is None:
+        df = _download(interval, retries, base_delay, period=period)
+    else:
+        new = _download(interval, retries, base_delay, start=start)
+        if new.empty:
+            return new
+        df = pd.concat([cached.reindex(columns=new.columns), new])
+        df = df.loc[~df.index.duplicated(keep="last")].sort_index()
+        df = df.loc[df.index >= df.index.max() - window]
+
+    if df.empty:
+        return df
+    try:
+        df.to_parquet(cache_path, compression="zstd")
+    except Exception as e:
+        print(f"⚠️ Cache write failed ({cache_path}): {e}")
+    return df
+
+def tail_bars(df: pd.DataFrame, bars: int, whole_utc_day: bool = False) -> pd.DataFrame:
+    """
+    Copy of the last `bars` rows: enough warm-up for the recursive indicators to converge
+    without rescanning the full history. With whole_utc_day, the window is widened to start
+    no later than the first bar of the latest UTC day so the daily VWAP stays exact.
+    """
+    start = max(len(df) - bars, 0)
+    if whole_utc_day and len(df):
+        idx = pd.to_datetime(df.index, utc=True)
+        start = min(start, int(idx.searchsorted(idx[-1].normalize())))
+    return df.iloc[start:].copy()
+
 def indicators_5m(df5: pd.DataFrame) -> pd.DataFrame:
-    df5["RSI"] = compute_rsi(df5["Close"], RSI_LEN_5)
-    df5["EMA9"]  = df5["Close"].ewm(span=EMA_FAST_5, adjust=False).mean()
-    df5["EMA21"] = df5["Close"].ewm(span=EMA_SLOW_5, adjust=False).mean()
+    # RSI, both EMAs and the swing high/low come out of one fused pass. The kernel reads
+    # Close/High/Low as contiguous float32 rows (half the bytes of float64, ~6e-8 relative
+    # rounding) and accumulates in float64.
+    close, high, low = np.ascontiguousarray(df5[["Close", "High", "Low"]].to_numpy(np.float32).T)
+    df5[["RSI", "EMA9", "EMA21", "SwingHigh", "SwingLow"]] = np.column_stack(rsi_ema_swing(
+        close, high, low, RSI_LEN_5, EMA_FAST_5, EMA_SLOW_5, SWING_LOOKBACK_5))
     df5["ATR"]   = compute_atr(df5, ATR_LEN_5)
     df5 = add_vwap(df5)
-    df5["SwingHigh"] = df5["High"].rolling(SWING_LOOKBACK_5).max()
-    df5["SwingLow"]  = df5["Low"].rolling(SWING_LOOKBACK_5).min()
     return df5
 
 def indicators_1h(df1h: pd.DataFrame) -> pd.DataFrame:
-    df1h["RSI"] = compute_rsi(df1h["Close"], RSI_LEN_1H)
-    df1h["EMA_FAST"] = df1h["Close"].ewm(span=EMA_FAST_1H, adjust=False).mean()
-    df1h["EMA_SLOW"] = df1h["Close"].ewm(span=EMA_SLOW_1H, adjust=False).mean()
+    close = df1h["Close"].to_numpy(np.float64, copy=False)
+    df1h[["RSI", "EMA_FAST", "EMA_SLOW"]] = np.column_stack((
+        rsi_wilder(close, RSI_LEN_1H),
+        ewma(close, EMA_FAST_1H),
+        ewma(close, EMA_SLOW_1H),
+    ))
+    return df1h
+
+def context_1h(now_utc: datetime) -> pd.DataFrame:
+    """
+    1h indicator frame for the 5m signal. Reused from CONTEXT_1H while it is younger than
+    CONTEXT_1H_MAX_AGE, so only about one run per hour downloads 60m bars; otherwise it is
+    refreshed incrementally and written back. Returns an empty DF if the fetch fails.
+    """
+    if CONTEXT_1H.exists():
+        mtime = datetime.fromtimestamp(CONTEXT_1H.stat().st_mtime, timezone.utc)
+        if now_utc - mtime < CONTEXT_1H_MAX_AGE:
+            cached = _read_cache(CONTEXT_1H)
+            if not cached.empty:
+                return cached
+
+    df1h = fetch_incremental("60m", "730d", CACHE_1H)
+    if df1h.empty:
+        return df1h
+    df1h = indicators_1h(tail_bars(df1h, TAIL_1H))
+    try:
+        df1h.to_parquet(CONTEXT_1H, compression="zstd")
+    except Exception as e:
+        print(f"⚠️ Cache write failed ({CONTEXT_1H}): {e}")
     return df1h
 
 def make_signal(df5: pd.DataFrame, df1h: pd.DataFrame):
     """Return tuple with all values needed for alert & logging."""
-    r5  = df5.iloc[-1]
-    r5p = df5.iloc[-2] if len(df5) > 1 else r5
-    r1h = df1h.iloc[-1]
-
-    price = float(r5["Close"])
-    rsi5  = float(r5["RSI"])
-    ema9  = float(r5["EMA9"])
-    ema21 = float(r5["EMA21"])
-    vwap  = float(r5["VWAP"])
-    atr   = float(r5["ATR"])
-    swing_high = float(r5["SwingHigh"])
-    swing_low  = float(r5["SwingLow"])
+    last5 = df5[["Close", "RSI", "EMA9", "EMA21", "VWAP", "ATR", "SwingHigh", "SwingLow"]].to_numpy(np.float64)[-2:]
+    price, rsi5, ema9, ema21, vwap, atr, swing_high, swing_low = last5[-1].tolist()
+    prev_close = float(last5[0, 0])  # == price when there is only one bar
 
     # 1h context
-    ema_fast_1h = float(r1h["EMA_FAST"])
-    ema_slow_1h = float(r1h["EMA_SLOW"])
-    rsi1h = float(r1h["RSI"])
+    ema_fast_1h, ema_slow_1h, rsi1h = df1h[["EMA_FAST", "EMA_SLOW", "RSI"]].to_numpy(np.float64)[-1].tolist()
     hourly_bull = ema_fast_1h > ema_slow_1h
     hourly_bear = ema_fast_1h < ema_slow_1h
 
     # 5m momentum & confirmation
     bullish_5 = ema9 > ema21
     bearish_5 = ema9 < ema21
-    tick_up   = price > float(r5p["Close"])
-    tick_down = price < float(r5p["Close"])
+    tick_up   = price > prev_close
+    tick_down = price < prev_close
 
     # VWAP proximity
     vwap_ok_buy  = (price >= vwap - VWAP_TOL * atr)
@@ -154,10 +430,67 @@ def make_signal(df5: pd.DataFrame, df1h: pd.DataFrame):
     reason = f"No confluence. 1h trend={'Bull' if hourly_bull else 'Bear' if hourly_bear else 'Flat'}, RSI5={rsi5:.2f}"
     return ("NO SIGNAL", reason, price, None, None, rsi5, ema9, ema21, vwap, atr, hourly_bull, hourly_bear, rsi1h)
 
+def scan_5m(now_utc: datetime):
+    """
+    Fetch the 5m bars and 1h context, compute indicators once and return make_signal's
+    tuple. Returns None (after printing why) when there is no usable data this run.
+    """
+    df5  = fetch_incremental("5m", "60d", CACHE_5M, reuse_current_bar=True)
+    df1h = context_1h(now_utc)
+
+    # If either fetch failed, skip safely
+    if df5.empty or df1h.empty:
+        msg = "Data fetch failed (empty df) — skipping this run."
+        print(f"🛑 {msg}")
+        # Optional heartbeat on failure:
+        # queue_email("BTC Bot: data fetch failed", f"{msg}\nTime: {ts_str(now_utc)}")
+        return None
+
+    df5 = indicators_5m(tail_bars(df5, TAIL_5M, whole_utc_day=True))
+
+    # Guard after indicators (in case rolling/ewm wiped all rows)
+    if df5.dropna().empty or df1h.dropna().empty:
+        print("🛑 Indicators produced empty data — skipping this run.")
+        return None
+
+    return make_signal(df5, df1h)
+
+_ALERT_BODY = """
+📈 BTC Day-Trade Alert: {signal}
+
+===============================
+📌 Signal time: {signal_time}
+📌 Timeframe: 5m (with 1h context)
+===============================
+
+💰 Price: ${price:,.2f}
+📊 RSI(5m,14): {rsi5:.2f}
+📉 EMA(5m,9):  ${ema9:,.2f}
+📈 EMA(5m,21): ${ema21:,.2f}
+📐 VWAP: ${vwap:,.2f}
+🌊 ATR(5m,14): ${atr5:,.2f}
+
+🧭 1h Trend: {trend}  |  RSI(1h): {rsi1h:.1f}
+📝 Reason: {reason}
+
+🎯 Target: ${target:,.2f}
+🛑 Stop:   ${stop:,.2f}
+""".format
+
+def alert_email(now_str: str, signal: str, reason: str, price: float, target, stop,
+                rsi5, ema9, ema21, vwap, atr5, hourly_bull, hourly_bear, rsi1h) -> tuple[str, str]:
+    """(subject, body) for a BUY/SELL alert; takes the run's ts_str(now), then make_signal's tuple."""
+    trend = "📈 Bullish" if hourly_bull else "📉 Bearish" if hourly_bear else "➖ Flat"
+    subject = f"BTC 5m Alert: {signal}"
+    body = _ALERT_BODY(signal=signal, signal_time=now_str, price=price, rsi5=rsi5,
+                       ema9=ema9, ema21=ema21, vwap=vwap, atr5=atr5, trend=trend, rsi1h=rsi1h,
+                       reason=reason, target=target, stop=stop)
+    return subject, body
+
 def append_signal_log(ts_utc: datetime, signal: str, price: float, target, stop,
                       rsi5, ema9, ema21, vwap, atr5, hourly_bull, hourly_bear, rsi1h, reason: str):
     row = {
-        "time_utc": ts_utc.isoformat(),
+        "time_utc": ts_utc,
         "signal": signal,
         "price": price,
         "target": target,
@@ -169,45 +502,47 @@ def append_signal_log(ts_utc: datetime, signal: str, price: float, target, stop,
         "atr5": atr5,
         "hourly_trend": "bull" if hourly_bull else "bear" if hourly_bear else "flat",
         "rsi1h": rsi1h,
-        "reason": reason
+        "reason": reason,
+        "date": ts_utc.strftime("%Y-%m-%d"),
     }
-    if LOG_PATH.exists():
-        df = pd.read_csv(LOG_PATH)
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    else:
-        df = pd.DataFrame([row])
-    df.to_csv(LOG_PATH, index=False)
+    # Each call adds one small file under LOG_PATH/date=YYYY-MM-DD/; nothing is rewritten
+    table = pa.Table.from_pylist([row], schema=LOG_SCHEMA)
+    pq.write_to_dataset(table, root_path=LOG_PATH, partition_cols=["date"])
+
+_DIGEST_EMPTY = """📣 BTC Hourly Update
+
+No BUY/SELL alerts in the last hour.
+
+🕒 Window: {start} → {end}
+""".format
+_DIGEST_HEAD = "📣 BTC Hourly Update\n\nTotal signals: {n}\n\n".format
+_DIGEST_LINE = ("- {} UTC | {} @ ${:,.2f} → Target ${:,.2f} | Stop ${:,.2f} | "
+                "1h {} | RSI5 {:.1f}\n").format
+_DIGEST_FOOT = "\n🕒 Window: {start} → {end}\n".format
 
 def hourly_digest(now_utc: datetime) -> str | None:
     if not LOG_PATH.exists():
         return None
-    df = pd.read_csv(LOG_PATH)
-    if df.empty:
-        return None
-    df["time_utc"] = pd.to_datetime(df["time_utc"], utc=True)
     window_start = now_utc - timedelta(hours=1)
-    recent = df[df["time_utc"] >= window_start]
+    # The date filter prunes whole partition directories (today's and, just after midnight,
+    # yesterday's); time_utc is stored typed, so the window filter is pushed into the scan
+    filters = [("date", ">=", window_start.strftime("%Y-%m-%d")), ("time_utc", ">=", window_start)]
+    recent = pq.read_table(LOG_PATH, filters=filters).to_pandas()
+    recent = recent.sort_values("time_utc")  # one file per signal; file order is arbitrary
     trades = recent[recent["signal"].isin(["BUY", "SELL"])]
     if trades.empty:
-        return f"""📣 BTC Hourly Update
-
-No BUY/SELL alerts in the last hour.
-
-🕒 Window: {ts_str(window_start)} → {ts_str(now_utc)}
-"""
-    lines = []
-    for _, r in trades.iterrows():
-        t = pd.to_datetime(r["time_utc"]).strftime("%H:%M:%S")
-        lines.append(
-            f"- {t} UTC | {r['signal']} @ ${float(r['price']):,.2f} → "
-            f"Target ${float(r['target']):,.2f} | Stop ${float(r['stop']):,.2f} | "
-            f"1h {r['hourly_trend']} | RSI5 {float(r['rsi5']):.1f}"
-        )
-    return f"""📣 BTC Hourly Update
-
-Total signals: {len(trades)}
-
-""" + "\n".join(lines) + f"""
-
-🕒 Window: {ts_str(window_start)} → {ts_str(now_utc)}
-"""
+        return _DIGEST_EMPTY(start=ts_str(window_start), end=ts_str(now_utc))
+    cols = zip(
+        trades["time_utc"].dt.strftime("%H:%M:%S").to_numpy(),
+        trades["signal"].to_numpy(),
+        trades["price"].to_numpy(dtype=np.float64),
+        trades["target"].to_numpy(dtype=np.float64),
+        trades["stop"].to_numpy(dtype=np.float64),
+        trades["hourly_trend"].to_numpy(),
+        trades["rsi5"].to_numpy(dtype=np.float64),
+    )
+    # Collect the pieces and join once instead of concatenating the body str by str
+    parts = [_DIGEST_HEAD(n=len(trades))]
+    parts.extend(_DIGEST_LINE(*row) for row in cols)
+    parts.append(_DIGEST_FOOT(start=ts_str(window_start), end=ts_str(now_utc)))
+    return "".join(parts)